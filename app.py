@@ -1,30 +1,129 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
+from cachetools import LRUCache
+import asyncio
 import json
+import orjson
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlparse, quote_plus
+from functools import lru_cache
 import time
+import logging
+import threading
 
+logger = logging.getLogger(__name__)
+
+SCHEMA_SCRIPT_RE = re.compile(r'(<script type="application/ld\+json">)(.*?)(</script>)', re.DOTALL)
+HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+DOCTYPE_RE = re.compile(rb'(?:\xef\xbb\xbf)?\s*<!doctype', re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
 def is_valid_url(url):
+    if not url:
+        return False
     try:
         result = urlparse(url)
-        return all([result.scheme, result.netloc])
+        return result.scheme in ('http', 'https') and bool(result.netloc)
     except:
         return False
 
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'br, gzip, deflate'
+}
+
+@st.cache_resource
+def get_http_session():
+    """Pooled keep-alive session shared across Streamlit reruns"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+    
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                          max_retries=Retry(total=2, backoff_factor=0.2))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Seconds a fetched page is served from the cache before it is revalidated
+HTML_CACHE_TTL = 600
+
+@st.cache_resource
+def get_html_cache():
+    """Fetched pages keyed by URL as (fetched_at, etag, last_modified, body), plus the lock guarding it across sessions"""
+    return LRUCache(maxsize=256), threading.Lock()
+
 def get_webpage_content(url):
+    cache, cache_lock = get_html_cache()
+    with cache_lock:
+        cached = cache.get(url)
+    if cached is not None and time.monotonic() - cached[0] < HTML_CACHE_TTL:
+        logger.info("HTML cache hit: %s", url)
+        return cached[3]
+    logger.info("HTML cache miss: %s", url)
+    
+    # Revalidate a stale entry so an unchanged page comes back as a bodiless 304
+    headers = {}
+    if cached is not None:
+        _, etag, last_modified, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    
+    import requests
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_session().get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and cached is not None:
+            logger.info("HTML cache revalidated: %s", url)
+            with cache_lock:
+                cache[url] = (time.monotonic(),) + cached[1:]
+            return cached[3]
         response.raise_for_status()
-        return response.text
+        with cache_lock:
+            cache[url] = (
+                time.monotonic(),
+                response.headers.get('ETag', ''),
+                response.headers.get('Last-Modified', ''),
+                response.content
+            )
+        return response.content
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching the webpage: {e}")
         return None
 
+async def verify_urls(urls, concurrency=50):
+    """Check that each URL resolves, returning a dict of url -> True/False"""
+    import aiohttp
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=5)
+    
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        async def check(url):
+            try:
+                async with semaphore, session.head(url, allow_redirects=True, timeout=timeout) as response:
+                    return url, response.status < 400
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return url, False
+        
+        return dict(await asyncio.gather(*[check(url) for url in urls]))
+
+def make_medical_condition(condition):
+    condition_obj = {
+        "@type": "MedicalCondition",
+        "name": condition["name"]
+    }
+    if condition.get("code_system") and condition.get("code_value"):
+        condition_obj["code"] = {
+            "@type": "MedicalCode",
+            "codeSystem": condition["code_system"],
+            "codeValue": condition["code_value"]
+        }
+    return condition_obj
+
 def generate_drug_schema(drug_name, generic_name, drug_description, manufacturer, active_ingredient, 
                          drug_class, prescription_status, same_as_urls, medical_codes=None, related_conditions=None):
     schema = {
@@ -44,32 +143,26 @@ def generate_drug_schema(drug_name, generic_name, drug_description, manufacturer
     }
     
     # Add medical codes if provided
-    if medical_codes and len(medical_codes) > 0:
-        schema["code"] = []
-        for code in medical_codes:
-            if code["system"] and code["value"]:
-                schema["code"].append({
-                    "@type": "MedicalCode",
-                    "codeSystem": code["system"],
-                    "codeValue": code["value"]
-                })
+    codes = [
+        {
+            "@type": "MedicalCode",
+            "codeSystem": code["system"],
+            "codeValue": code["value"]
+        }
+        for code in medical_codes or ()
+        if code.get("system") and code.get("value")
+    ]
+    if codes:
+        schema["code"] = codes
     
     # Add related conditions if provided
-    if related_conditions and len(related_conditions) > 0:
-        schema["indication"] = []
-        for condition in related_conditions:
-            if condition["name"]:
-                condition_obj = {
-                    "@type": "MedicalCondition",
-                    "name": condition["name"]
-                }
-                if condition["code_system"] and condition["code_value"]:
-                    condition_obj["code"] = {
-                        "@type": "MedicalCode",
-                        "codeSystem": condition["code_system"],
-                        "codeValue": condition["code_value"]
-                    }
-                schema["indication"].append(condition_obj)
+    indications = [
+        make_medical_condition(condition)
+        for condition in related_conditions or ()
+        if condition.get("name")
+    ]
+    if indications:
+        schema["indication"] = indications
     
     return schema
 
@@ -96,41 +189,50 @@ def generate_clinical_trial_schema(trial_id, trial_name, trial_description, spon
     }
     
     # Add related publications if provided
-    if related_publications and len(related_publications) > 0:
-        schema["citation"] = []
-        for pub in related_publications:
-            if pub["url"] and pub["title"]:
-                schema["citation"].append({
-                    "@type": "ScholarlyArticle",
-                    "url": pub["url"],
-                    "headline": pub["title"]
-                })
+    citations = [
+        {
+            "@type": "ScholarlyArticle",
+            "url": pub["url"],
+            "headline": pub["title"]
+        }
+        for pub in related_publications or ()
+        if pub.get("url") and pub.get("title")
+    ]
+    if citations:
+        schema["citation"] = citations
     
     return schema
 
 def inject_schema_into_html(html_content, schema_json):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # ASCII-escaped JSON is byte-identical in any page encoding
+    schema_str = json.dumps(schema_json, indent=2)
     
-    # Create a new script tag for the schema
-    script_tag = soup.new_tag('script')
-    script_tag['type'] = 'application/ld+json'
-    script_tag.string = json.dumps(schema_json, indent=2)
+    # Fast path: splice the script tag in front of </head> without parsing the page
+    head_end_match = HEAD_END_RE.search(html_content)
+    if head_end_match:
+        head_end = head_end_match.start()
+        script_tag = f'<script type="application/ld+json">\n{schema_str}\n</script>\n'.encode('ascii')
+        return html_content[:head_end] + script_tag + html_content[head_end:]
     
-    # Add the script tag to the head
-    if soup.head:
-        soup.head.append(script_tag)
-    else:
+    from lxml import etree, html as lxml_html
+    
+    tree = lxml_html.document_fromstring(html_content)
+    head = tree.find('head')
+    if head is None:
         # Create head if it doesn't exist
-        head = soup.new_tag('head')
-        head.append(script_tag)
-        soup.html.insert(0, head)
+        head = etree.Element('head')
+        tree.insert(0, head)
+    
+    script_tag = etree.SubElement(head, 'script', type='application/ld+json')
+    script_tag.text = schema_str
     
-    return str(soup)
+    # lxml adds an HTML 4 doctype to pages without one, so only serialize the page's own
+    document = tree.getroottree() if DOCTYPE_RE.match(html_content) else tree
+    encoding = tree.getroottree().docinfo.encoding or 'utf-8'
+    return etree.tostring(document, encoding=encoding, method='html')
 
 def highlight_schema(html_content):
     # Highlight the schema.org markup in the HTML
-    pattern = r'(<script type="application/ld\+json">)(.*?)(</script>)'
-    
     def highlight_match(match):
         script_open = match.group(1)
         json_content = match.group(2)
@@ -138,135 +240,131 @@ def highlight_schema(html_content):
         
         # Format the JSON for better readability
         try:
-            formatted_json = json.dumps(json.loads(json_content), indent=2)
+            formatted_json = orjson.dumps(orjson.loads(json_content), option=orjson.OPT_INDENT_2).decode()
         except:
             formatted_json = json_content
             
         return f'{script_open}{formatted_json}{script_close}'
     
-    highlighted_html = re.sub(pattern, highlight_match, html_content, flags=re.DOTALL)
+    highlighted_html = SCHEMA_SCRIPT_RE.sub(highlight_match, html_content)
     return highlighted_html
 
+# Authoritative sources organized by recommended categories from the criteria.
+# Sources without an example_url get a drug-specific URL from find_similar_websites.
+SOURCE_TEMPLATES = (
+    ("Chemical & Pharmacological Databases", {
+        "name": "DrugBank",
+        "base_url": "https://go.drugbank.com",
+        "search_pattern": "https://go.drugbank.com/drugs/DB*",
+        "example_url": "https://go.drugbank.com/drugs/DB00043",
+        "site_type": "Drug Database",
+        "priority": "High"
+    }),
+    ("Chemical & Pharmacological Databases", {
+        "name": "PubChem",
+        "base_url": "https://pubchem.ncbi.nlm.nih.gov",
+        "search_pattern": "https://pubchem.ncbi.nlm.nih.gov/compound/*",
+        "example_url": "https://pubchem.ncbi.nlm.nih.gov/compound/24822794",
+        "site_type": "Chemical Database",
+        "priority": "High"
+    }),
+    ("Chemical & Pharmacological Databases", {
+        "name": "ChEMBL",
+        "base_url": "https://www.ebi.ac.uk/chembl",
+        "search_pattern": "https://www.ebi.ac.uk/chembl/compound_report_card/*",
+        "example_url": "https://www.ebi.ac.uk/chembl/compound_report_card/CHEMBL1201606/",
+        "site_type": "Bioactivity Database",
+        "priority": "Medium"
+    }),
+    ("Regulatory & Clinical Sources", {
+        "name": "FDA",
+        "base_url": "https://www.fda.gov",
+        "search_pattern": "https://www.fda.gov/drugs/postmarket-drug-safety-information-patients-and-providers/*",
+        "example_url": None,
+        "site_type": "Regulatory Information",
+        "priority": "Very High"
+    }),
+    ("Regulatory & Clinical Sources", {
+        "name": "ClinicalTrials.gov",
+        "base_url": "https://clinicaltrials.gov",
+        "search_pattern": "https://clinicaltrials.gov/study/*",
+        "example_url": "https://clinicaltrials.gov/search?term=NCT00377572",
+        "site_type": "Clinical Trials",
+        "priority": "High"
+    }),
+    ("Regulatory & Clinical Sources", {
+        "name": "DailyMed",
+        "base_url": "https://dailymed.nlm.nih.gov",
+        "search_pattern": "https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid=*",
+        "example_url": "https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid=a30a77e6-8c30-4aa2-bec2-77fb5e13dc66",
+        "site_type": "Label Information",
+        "priority": "High"
+    }),
+    ("Medical Knowledge Graphs", {
+        "name": "Wikidata",
+        "base_url": "https://www.wikidata.org",
+        "search_pattern": "https://www.wikidata.org/wiki/*",
+        "example_url": "https://www.wikidata.org/wiki/Q204711",
+        "site_type": "Knowledge Graph",
+        "priority": "Medium"
+    }),
+    ("Medical Knowledge Graphs", {
+        "name": "Wikipedia",
+        "base_url": "https://en.wikipedia.org",
+        "search_pattern": "https://en.wikipedia.org/wiki/*",
+        "example_url": None,
+        "site_type": "Encyclopedia",
+        "priority": "Medium"
+    }),
+    ("Standardized Ontologies", {
+        "name": "MeSH",
+        "base_url": "https://meshb.nlm.nih.gov",
+        "search_pattern": "https://meshb.nlm.nih.gov/record/ui?ui=*",
+        "example_url": "https://meshb.nlm.nih.gov/record/ui?ui=C079635",
+        "site_type": "Medical Ontology",
+        "priority": "High"
+    }),
+    ("Standardized Ontologies", {
+        "name": "WHO ATC",
+        "base_url": "https://www.whocc.no",
+        "search_pattern": "https://www.whocc.no/atc_ddd_index/?code=*",
+        "example_url": "https://www.whocc.no/atc_ddd_index/?code=R03DX05",
+        "site_type": "Classification System",
+        "priority": "Medium"
+    }),
+    ("Research & Publications", {
+        "name": "PubMed",
+        "base_url": "https://pubmed.ncbi.nlm.nih.gov",
+        "search_pattern": "https://pubmed.ncbi.nlm.nih.gov/*",
+        "example_url": None,
+        "site_type": "Research Database",
+        "priority": "High"
+    })
+)
+
+@st.cache_data(ttl=3600, max_entries=512)
 def find_similar_websites(drug_name, generic_name=None, drug_class=None):
     """Find similar authoritative websites for a given drug with specific categorization"""
-    similar_sites = []
-    
     search_term = generic_name if generic_name else drug_name
+    drug_lower = drug_name.lower()
+    generic_lower = generic_name.lower() if generic_name else ''
     
-    # Organized by recommended categories from the criteria
-    sources = {
-        "Chemical & Pharmacological Databases": [
-            {
-                "name": "DrugBank",
-                "base_url": "https://go.drugbank.com",
-                "search_pattern": f"https://go.drugbank.com/drugs/DB*",
-                "example_url": f"https://go.drugbank.com/drugs/DB00043",
-                "site_type": "Drug Database",
-                "priority": "High"
-            },
-            {
-                "name": "PubChem",
-                "base_url": "https://pubchem.ncbi.nlm.nih.gov",
-                "search_pattern": f"https://pubchem.ncbi.nlm.nih.gov/compound/*",
-                "example_url": f"https://pubchem.ncbi.nlm.nih.gov/compound/24822794",
-                "site_type": "Chemical Database",
-                "priority": "High"
-            },
-            {
-                "name": "ChEMBL",
-                "base_url": "https://www.ebi.ac.uk/chembl",
-                "search_pattern": f"https://www.ebi.ac.uk/chembl/compound_report_card/*",
-                "example_url": f"https://www.ebi.ac.uk/chembl/compound_report_card/CHEMBL1201606/",
-                "site_type": "Bioactivity Database",
-                "priority": "Medium"
-            }
-        ],
-        "Regulatory & Clinical Sources": [
-            {
-                "name": "FDA",
-                "base_url": "https://www.fda.gov",
-                "search_pattern": f"https://www.fda.gov/drugs/postmarket-drug-safety-information-patients-and-providers/*",
-                "example_url": f"https://www.fda.gov/drugs/postmarket-drug-safety-information-patients-and-providers/{drug_name.lower()}-{generic_name.lower() if generic_name else ''}-information",
-                "site_type": "Regulatory Information",
-                "priority": "Very High"
-            },
-            {
-                "name": "ClinicalTrials.gov",
-                "base_url": "https://clinicaltrials.gov",
-                "search_pattern": f"https://clinicaltrials.gov/study/*",
-                "example_url": f"https://clinicaltrials.gov/search?term=NCT00377572",
-                "site_type": "Clinical Trials",
-                "priority": "High"
-            },
-            {
-                "name": "DailyMed",
-                "base_url": "https://dailymed.nlm.nih.gov",
-                "search_pattern": f"https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid=*",
-                "example_url": f"https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid=a30a77e6-8c30-4aa2-bec2-77fb5e13dc66",
-                "site_type": "Label Information",
-                "priority": "High"
-            }
-        ],
-        "Medical Knowledge Graphs": [
-            {
-                "name": "Wikidata",
-                "base_url": "https://www.wikidata.org",
-                "search_pattern": f"https://www.wikidata.org/wiki/*",
-                "example_url": f"https://www.wikidata.org/wiki/Q204711",
-                "site_type": "Knowledge Graph",
-                "priority": "Medium"
-            },
-            {
-                "name": "Wikipedia",
-                "base_url": "https://en.wikipedia.org",
-                "search_pattern": f"https://en.wikipedia.org/wiki/*",
-                "example_url": f"https://en.wikipedia.org/wiki/{generic_name.lower() if generic_name else drug_name.lower()}",
-                "site_type": "Encyclopedia",
-                "priority": "Medium"
-            }
-        ],
-        "Standardized Ontologies": [
-            {
-                "name": "MeSH",
-                "base_url": "https://meshb.nlm.nih.gov",
-                "search_pattern": f"https://meshb.nlm.nih.gov/record/ui?ui=*",
-                "example_url": f"https://meshb.nlm.nih.gov/record/ui?ui=C079635",
-                "site_type": "Medical Ontology",
-                "priority": "High"
-            },
-            {
-                "name": "WHO ATC",
-                "base_url": "https://www.whocc.no",
-                "search_pattern": f"https://www.whocc.no/atc_ddd_index/?code=*",
-                "example_url": f"https://www.whocc.no/atc_ddd_index/?code=R03DX05",
-                "site_type": "Classification System",
-                "priority": "Medium"
-            }
-        ],
-        "Research & Publications": [
-            {
-                "name": "PubMed",
-                "base_url": "https://pubmed.ncbi.nlm.nih.gov",
-                "search_pattern": f"https://pubmed.ncbi.nlm.nih.gov/*",
-                "example_url": f"https://pubmed.ncbi.nlm.nih.gov/?term={search_term}+clinical+trial",
-                "site_type": "Research Database",
-                "priority": "High"
-            }
-        ]
+    drug_urls = {
+        "FDA": f"https://www.fda.gov/drugs/postmarket-drug-safety-information-patients-and-providers/{drug_lower}-{generic_lower}-information",
+        "Wikipedia": f"https://en.wikipedia.org/wiki/{generic_lower or drug_lower}",
+        "PubMed": f"https://pubmed.ncbi.nlm.nih.gov/?term={quote_plus(search_term)}+clinical+trial"
     }
     
-    # Add all site categories to the results
-    for category, category_sources in sources.items():
-        for source in category_sources:
-            similar_sites.append({
-                "name": source["name"],
-                "url": source["example_url"],
-                "type": source["site_type"],
-                "category": category,
-                "priority": source["priority"]
-            })
-    
-    return similar_sites
+    return [
+        {
+            "name": source["name"],
+            "url": source["example_url"] or drug_urls[source["name"]],
+            "type": source["site_type"],
+            "category": category,
+            "priority": source["priority"]
+        }
+        for category, source in SOURCE_TEMPLATES
+    ]
 
 st.set_page_config(page_title="Drug Schema Markup Generator", layout="wide")
 
@@ -288,19 +386,20 @@ with tab1:
             with st.spinner("Fetching and analyzing the webpage..."):
                 html_content = get_webpage_content(url)
                 if html_content:
-                    soup = BeautifulSoup(html_content, 'html.parser')
+                    from selectolax.parser import HTMLParser
                     
                     # Find all schema.org markup
-                    schema_scripts = soup.find_all('script', type='application/ld+json')
+                    tree = HTMLParser(html_content)
+                    schema_scripts = tree.css('script[type="application/ld+json"]')
                     
                     if schema_scripts:
                         st.success(f"Found {len(schema_scripts)} schema.org markup blocks on the page")
                         for i, script in enumerate(schema_scripts):
                             try:
-                                schema_data = json.loads(script.string)
+                                schema_data = orjson.loads(script.text())
                                 st.subheader(f"Schema #{i+1}")
                                 st.json(schema_data)
-                            except json.JSONDecodeError:
+                            except orjson.JSONDecodeError:
                                 st.error(f"Schema #{i+1} contains invalid JSON")
                     else:
                         st.warning("No schema.org markup found on the page")
@@ -377,19 +476,20 @@ with tab2:
     """)
     
     # For Xolair example, add the recommended URLs based on the provided criteria
-    same_as_urls = []
+    # Ordered set of URLs (dict keys) so duplicates across fields are dropped
+    same_as_urls = {}
     
     st.markdown("##### Chemical & Pharmacological Databases")
     db_cols = st.columns(2)
     with db_cols[0]:
         drugbank_url = st.text_input("DrugBank URL", key="drugbank", value="https://drugbank.ca/drugs/DB00043")
         if drugbank_url and is_valid_url(drugbank_url):
-            same_as_urls.append(drugbank_url)
+            same_as_urls[drugbank_url] = None
     
     with db_cols[1]:
         pubchem_url = st.text_input("PubChem URL", key="pubchem", value="https://pubchem.ncbi.nlm.nih.gov/compound/24822794")
         if pubchem_url and is_valid_url(pubchem_url):
-            same_as_urls.append(pubchem_url)
+            same_as_urls[pubchem_url] = None
     
     st.markdown("##### Regulatory & Clinical Sources")
     reg_cols = st.columns(2)
@@ -397,37 +497,37 @@ with tab2:
         fda_url = st.text_input("FDA URL", key="fda", 
                                value="https://www.fda.gov/drugs/postmarket-drug-safety-information-patients-and-providers/xolair-omalizumab-information")
         if fda_url and is_valid_url(fda_url):
-            same_as_urls.append(fda_url)
+            same_as_urls[fda_url] = None
     
     with reg_cols[1]:
         clinical_trials_url = st.text_input("ClinicalTrials.gov URL", key="clinicaltrials", 
                                          value="https://clinicaltrials.gov/search?term=NCT00377572")
         if clinical_trials_url and is_valid_url(clinical_trials_url):
-            same_as_urls.append(clinical_trials_url)
+            same_as_urls[clinical_trials_url] = None
     
     st.markdown("##### Medical Knowledge Graphs")
     kg_cols = st.columns(2)
     with kg_cols[0]:
         wikidata_url = st.text_input("Wikidata URL", key="wikidata", value="https://www.wikidata.org/wiki/Q204711")
         if wikidata_url and is_valid_url(wikidata_url):
-            same_as_urls.append(wikidata_url)
+            same_as_urls[wikidata_url] = None
     
     with kg_cols[1]:
         wikipedia_url = st.text_input("Wikipedia URL", key="wikipedia", value="https://en.wikipedia.org/wiki/Omalizumab")
         if wikipedia_url and is_valid_url(wikipedia_url):
-            same_as_urls.append(wikipedia_url)
+            same_as_urls[wikipedia_url] = None
     
     st.markdown("##### Standardized Ontologies")
     onto_cols = st.columns(2)
     with onto_cols[0]:
         mesh_url = st.text_input("MeSH URL", key="mesh", value="https://meshb.nlm.nih.gov/record/ui?ui=C079635")
         if mesh_url and is_valid_url(mesh_url):
-            same_as_urls.append(mesh_url)
+            same_as_urls[mesh_url] = None
     
     with onto_cols[1]:
         atc_url = st.text_input("WHO ATC URL", key="atc", value="https://www.whocc.no/atc_ddd_index/?code=R03DX05")
         if atc_url and is_valid_url(atc_url):
-            same_as_urls.append(atc_url)
+            same_as_urls[atc_url] = None
     
     st.markdown("##### Additional URLs")
     additional_cols = st.columns(2)
@@ -435,48 +535,69 @@ with tab2:
         pubmed_url = st.text_input("PubMed URL (Key Publication)", key="pubmed", 
                                   value="https://pubmed.ncbi.nlm.nih.gov/19818196/")
         if pubmed_url and is_valid_url(pubmed_url):
-            same_as_urls.append(pubmed_url)
+            same_as_urls[pubmed_url] = None
     
     with additional_cols[1]:
         other_url = st.text_input("Other Authoritative URL", key="other")
         if other_url and is_valid_url(other_url):
-            same_as_urls.append(other_url)
+            same_as_urls[other_url] = None
+    
+    # Found sites and their sameAs selections belong to the drug they were searched for
+    similar_sites_key = (drug_name, generic_name, drug_class)
+    if st.session_state.get("similar_sites_key") != similar_sites_key:
+        for key in list(st.session_state.keys()):
+            if key == "similar_sites" or key.startswith("similar_add_"):
+                del st.session_state[key]
     
     if st.button("Find Similar Sites", key="find_similar"):
         if drug_name:
             with st.spinner("Searching for similar authoritative websites..."):
-                similar_sites = find_similar_websites(drug_name, generic_name, drug_class)
-                
-                if similar_sites:
-                    st.success(f"Found {len(similar_sites)} similar websites")
-                    
-                    # Group by category
-                    categories = {}
-                    for site in similar_sites:
-                        category = site["category"]
-                        if category not in categories:
-                            categories[category] = []
-                        categories[category].append(site)
-                    
-                    # Display by category
-                    for category, sites in categories.items():
-                        st.markdown(f"#### {category}")
-                        for site in sites:
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.markdown(f"**{site['name']}** ({site['type']}) - {site['priority']} Priority")
-                                st.markdown(f"URL: {site['url']}")
-                            with col2:
-                                if st.button(f"Add to sameAs", key=f"add_{site['url']}"):
-                                    if site['url'] not in same_as_urls:
-                                        same_as_urls.append(site['url'])
-                                        st.success(f"Added {site['url']} to sameAs list")
-                            st.markdown("---")
-                else:
-                    st.warning("No similar websites found")
+                # Keep the results across reruns so the sameAs selections below take effect
+                st.session_state["similar_sites"] = find_similar_websites(drug_name, generic_name, drug_class)
+                st.session_state["similar_sites_key"] = similar_sites_key
         else:
             st.error("Please enter a drug name to find similar websites")
     
+    if "similar_sites" in st.session_state:
+        similar_sites = st.session_state["similar_sites"]
+        
+        if similar_sites:
+            st.success(f"Found {len(similar_sites)} similar websites")
+            
+            # Group by category
+            categories = {}
+            for site in similar_sites:
+                category = site["category"]
+                if category not in categories:
+                    categories[category] = []
+                categories[category].append(site)
+            
+            # Display by category, one table and one selector each
+            for category, sites in categories.items():
+                st.markdown(f"#### {category}")
+                st.markdown("| Name | Type | Priority | URL |\n|---|---|---|---|\n" + "\n".join(
+                    f"| {site['name']} | {site['type']} | {site['priority']} | [{site['url']}](<{site['url']}>) |"
+                    for site in sites
+                ))
+                selected_urls = st.multiselect("Add to sameAs", [site['url'] for site in sites],
+                                               key=f"similar_add_{category}")
+                for selected_url in selected_urls:
+                    same_as_urls.setdefault(selected_url, None)
+        else:
+            st.warning("No similar websites found")
+    
+    if st.button("Validate URLs", key="validate_urls"):
+        if same_as_urls:
+            with st.spinner("Checking that the sameAs URLs resolve..."):
+                results = asyncio.run(verify_urls(list(same_as_urls)))
+            for url, ok in results.items():
+                if ok:
+                    st.success(f"Reachable: {url}")
+                else:
+                    st.error(f"Unreachable: {url}")
+        else:
+            st.warning("No sameAs URLs to validate")
+    
     webpage_url = st.text_input("Your Webpage URL (optional)", key="drug_webpage_url", value="https://www.xolair.com")
     
     if st.button("Generate Drug Schema", key="gen_drug_btn"):
@@ -489,7 +610,7 @@ with tab2:
                 active_ingredient, 
                 drug_class, 
                 prescription_status, 
-                same_as_urls,
+                list(same_as_urls),
                 medical_codes,
                 related_conditions
             )
@@ -497,7 +618,7 @@ with tab2:
             st.subheader("Generated Schema")
             st.json(drug_schema)
             
-            schema_json_str = json.dumps(drug_schema, indent=2)
+            schema_json_str = orjson.dumps(drug_schema, option=orjson.OPT_INDENT_2).decode()
             st.code(f'<script type="application/ld+json">\n{schema_json_str}\n</script>', language='html')
             
             if webpage_url and is_valid_url(webpage_url):
@@ -582,7 +703,7 @@ with tab3:
             st.subheader("Generated Schema")
             st.json(trial_schema)
             
-            schema_json_str = json.dumps(trial_schema, indent=2)
+            schema_json_str = orjson.dumps(trial_schema, option=orjson.OPT_INDENT_2).decode()
             st.code(f'<script type="application/ld+json">\n{schema_json_str}\n</script>', language='html')
             
             if trial_webpage_url and is_valid_url(trial_webpage_url):
@@ -638,7 +759,7 @@ with tab4:
                             st.dataframe(site_data)
                     
                     # Create a downloadable list
-                    sites_json = json.dumps(sites, indent=2)
+                    sites_json = orjson.dumps(sites, option=orjson.OPT_INDENT_2)
                     st.download_button(
                         label="Download Sites as JSON",
                         data=sites_json,